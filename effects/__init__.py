@@ -1,5 +1,7 @@
 import uasyncio as asyncio
 
+from .budget import LoopLagMonitor, RenderBudget
+from .clock import FrameClock
 from .firev2 import FireEffectV2
 from .strobe import StrobeEffect
 from .twinkle import TwinkleEffect
@@ -7,13 +9,15 @@ from .twinkle import TwinkleEffect
 
 class EffectManager:
 
-    def __init__(self, strip, stop_event):
+    def __init__(self, strip, stop_event, clock=None):
         """
         Initialize the EffectManager class.
 
         Parameters:
         - strip: An instance of the LED strip driver.
         - stop_event: An asyncio Event object used to signal the stop of the current effect.
+        - clock: A FrameClock shared by all effects (optional). Pass the clock of a sync.SyncNode
+                 to keep several controllers frame-aligned.
 
         The EffectManager class manages and handles different LED strip effects.
         It initializes the LED strip driver, a dictionary of available effects,
@@ -28,6 +32,7 @@ class EffectManager:
         self.current_effect_task = None
         self.lock = asyncio.Lock()
         self.stop_event = stop_event
+        self.clock = clock or FrameClock()
 
     async def stop_all(self):
         """
@@ -46,8 +51,7 @@ class EffectManager:
         """
         Turn off the LED strip by setting all LEDs to black (0, 0, 0) and writing the changes to the strip.
         """
-        for i in range(len(self.strip)):
-            self.strip[i] = (0, 0, 0)
+        self.strip.fill((0, 0, 0))
         await self.strip.write()
 
         
@@ -78,7 +82,7 @@ class EffectManager:
                 print(f"{effect_class.__name__} Startup...")
                 try:
                     self.current_effect_task = asyncio.create_task(
-                        effect_class(self.strip, params).run(self.stop_event)
+                        effect_class(self.strip, params, self.clock).run(self.stop_event)
                     )
                 except Exception as e:
                     print(f"Error when starting the effect: {effect_class.__name__}\n{e}")
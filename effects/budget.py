@@ -0,0 +1,104 @@
+import uasyncio as asyncio
+import utime
+
+
+class RenderBudget:
+    """
+    Limits how long an effect may render without giving control back to the event loop.
+
+    Effects process the strip in chunks of ``CHUNK`` pixels and call ``check()`` after each chunk.
+    Once the budget is spent the effect yields, so the web server and the Wi-Fi stack
+    are never blocked for longer than about one budget, however long the strip is.
+    """
+
+    CHUNK = 32  # Pixels processed between two budget checks
+
+    def __init__(self, budget_ms=10):
+        """
+        Initializes the render budget.
+
+        Parameters:
+            budget_ms (int): The time an effect may render before yielding, in ms (default is 10).
+        """
+        self.budget_ms = budget_ms
+        self.yields = 0  # Number of yields, useful to see how often the budget runs out
+        self._slice_start = utime.ticks_ms()
+
+    def start(self):
+        """
+        Starts a new time slice. Call it at the beginning of every frame.
+        """
+        self._slice_start = utime.ticks_ms()
+
+    async def check(self):
+        """
+        Yields to the event loop if the current time slice is used up.
+        """
+        if utime.ticks_diff(utime.ticks_ms(), self._slice_start) >= self.budget_ms:
+            self.yields += 1
+            await asyncio.sleep(0)
+            self._slice_start = utime.ticks_ms()
+
+
+class LoopLagMonitor:
+    """
+    Measures the scheduling delay of the event loop and lowers the frame rate under load.
+
+    The monitor sleeps for ``interval`` and measures how late it wakes up. While the average lag
+    is above the threshold the frame clock renders only every ``divider``-th frame (1, 2, 4, ...).
+    The rendered frames stay on the grid of the original ones and keep their random choices, but a
+    loaded controller shows fewer of them than its synchronized neighbours.
+    """
+
+    def __init__(self, interval=0.05, threshold_ms=20, max_divider=4, hold=20):
+        """
+        Initializes the loop lag monitor.
+
+        Parameters:
+            interval (float): The sampling period in seconds (default is 0.05).
+            threshold_ms (int): The average lag above which the frame rate is lowered (default is 20).
+            max_divider (int): The largest frame period multiplier (default is 4).
+            hold (int): The number of samples to wait after a change before the next one (default is 20).
+        """
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.max_divider = max_divider
+        self.hold = hold
+        self.lag_ms = 0.0  # Moving average of the scheduling delay (float, so it does not settle below the lag)
+        self.max_lag_ms = 0
+        self.divider = 1
+        self._samples_since_change = 0
+
+    def add_sample(self, lag_ms):
+        """
+        Adds a lag measurement and updates the frame period multiplier.
+
+        Parameters:
+            lag_ms (int): How late the loop woke up, in ms.
+        """
+        self.lag_ms = self.lag_ms * 0.75 + lag_ms * 0.25
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self._samples_since_change += 1
+        if self._samples_since_change < self.hold:
+            return
+        if self.lag_ms > self.threshold_ms and self.divider < self.max_divider:
+            self.divider *= 2
+            self._samples_since_change = 0
+            print(f"Event loop lag {self.lag_ms:.0f} ms, rendering 1 of {self.divider} frames")
+        elif self.lag_ms < self.threshold_ms // 2 and self.divider > 1:
+            self.divider //= 2
+            self._samples_since_change = 0
+            print(f"Event loop lag {self.lag_ms:.0f} ms, rendering 1 of {self.divider} frames")
+
+    async def run(self, stop_event):
+        """
+        Samples the event loop lag until the stop event is set.
+
+        Parameters:
+            stop_event (asyncio.Event): An event object used to stop the monitor.
+        """
+        interval_ms = int(self.interval * 1000)
+        while not stop_event.is_set():
+            start = utime.ticks_ms()
+            await asyncio.sleep(self.interval)
+            self.add_sample(max(0, utime.ticks_diff(utime.ticks_ms(), start) - interval_ms))
@@ -0,0 +1,106 @@
+import random
+
+import uasyncio as asyncio
+import utime
+
+
+class FrameClock:
+    """
+    A shared frame clock for LED effects.
+
+    Time is counted in milliseconds since the clock epoch and split into frames of a given period,
+    so frame *k* of a period always starts at ``k * period``. Controllers whose clocks share the same
+    offset (see ``sync.SyncNode``) therefore render the same frame at the same moment.
+    Before each frame the ``random`` generator is reseeded from (seed, frame), which makes
+    the random choices of an effect identical on every controller.
+    """
+
+    # Errors larger than this are applied at once, smaller ones are slewed in
+    SNAP_MS = 500
+
+    def __init__(self, seed=0, lag_monitor=None):
+        """
+        Initializes the frame clock.
+
+        Parameters:
+            seed (int): The effect seed used to reseed ``random`` on every frame (default is 0).
+            lag_monitor: A ``LoopLagMonitor`` whose divider skips frames under load (optional).
+        """
+        self.seed = seed
+        self.lag_monitor = lag_monitor
+        self.offset = 0  # Correction added to the local time, in ms
+        self._last_ticks = utime.ticks_ms()
+        self._local_ms = 0
+
+    def local_ms(self):
+        """
+        Returns the local monotonic time in milliseconds.
+
+        ``ticks_ms()`` wraps around, so the elapsed ticks are accumulated into a plain counter.
+        """
+        now = utime.ticks_ms()
+        self._local_ms += utime.ticks_diff(now, self._last_ticks)
+        self._last_ticks = now
+        return self._local_ms
+
+    def now_ms(self):
+        """
+        Returns the synchronized time in milliseconds.
+        """
+        return self.local_ms() + self.offset
+
+    def adjust(self, reference_ms):
+        """
+        Moves the clock towards a reference time received from the leader.
+
+        Large errors (after a restart or a lost leader) are corrected at once,
+        small ones are halved on every call so the frame rate does not jump.
+
+        Parameters:
+            reference_ms (int): The leader time in milliseconds.
+
+        Returns:
+            int: The error in milliseconds before the correction.
+        """
+        error = reference_ms - self.now_ms()
+        if abs(error) > self.SNAP_MS:
+            self.offset += error
+        else:
+            self.offset += error // 2
+        return error
+
+    def frame(self, period):
+        """
+        Returns the number of the current frame.
+
+        Parameters:
+            period (float): The frame period in seconds.
+        """
+        return self.now_ms() // max(1, int(period * 1000))
+
+    async def wait_frame(self, period):
+        """
+        Waits for the start of the next frame and prepares ``random`` for it.
+
+        This replaces ``asyncio.sleep(period)`` in effects: the delay is measured to the next frame
+        boundary instead of from the end of the previous frame, so rendering time does not add up.
+
+        While the event loop is overloaded the lag monitor divider skips frames: with divider 2 only every
+        second frame is rendered. Frames keep their numbers in base periods, so a frame rendered on a loaded
+        board gets the same random choices as on the others, but boards running at different dividers
+        render different subsets of the frames.
+
+        Parameters:
+            period (float): The frame period in seconds.
+
+        Returns:
+            int: The number of the frame that has started, counted in periods of ``period``.
+        """
+        period_ms = max(1, int(period * 1000))
+        divider = self.lag_monitor.divider if self.lag_monitor else 1
+        frame = (self.now_ms() // (period_ms * divider) + 1) * divider
+        delay = frame * period_ms - self.now_ms()
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        random.seed((self.seed * 1000003 + frame) & 0x3FFFFFFF)
+        return frame
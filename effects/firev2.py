@@ -1,6 +1,7 @@
 import random
 
-import uasyncio as asyncio
+from .budget import RenderBudget
+from .clock import FrameClock
 
 
 class FireEffectV2:
@@ -11,7 +12,7 @@ class FireEffectV2:
     to create a more realistic fire effect on an LED strip.
     """
 
-    def __init__(self, strip, params):
+    def __init__(self, strip, params, clock=None):
         """
         Initializes the fire effect for an LED strip using a more complex algorithm for a realistic effect.
 
@@ -24,8 +25,10 @@ class FireEffectV2:
                 - intensity (float): Effect intensity (0.0-1.0, default is 0.5).
                 - speed (float): Effect speed in seconds (default is 0.1).
                 - cooling (int): Cooling rate (0-255, default is 50).
+            clock: The FrameClock that paces the frames (optional, a local clock is created if omitted).
         """
         self.strip = strip
+        self.clock = clock or FrameClock()
         self.n = len(self.strip)  # Number of LEDs
         self.r, self.g, self.b = self._parse_params(params)
         self.intensity = params.get('intensity', 128) / 255.0  # normalized to a range 0.0 to 1.0
@@ -33,6 +36,7 @@ class FireEffectV2:
         self.cooling = int(params.get('cooling', 40))  # Affects the rate of attenuation
         self.heat = [0] * self.n  # Temperature array for each LED
         self.palette = self._generate_palette(self.r, self.g, self.b)  # Generating a color palette
+        self.budget = RenderBudget()  # Yields to the web server while a long strip is rendered
 
     @staticmethod
     def _parse_params(params):
@@ -95,28 +99,39 @@ class FireEffectV2:
         ------
         - The method uses the `heat` array to simulate temperature changes along the strip.
         - It adds random heat, simulates heat propagation and cooling, and maps temperatures to colors.
-        - The effect is updated at intervals specified by `self.speed`.
+        - The effect is updated on the frames of `self.clock` with the period `self.speed`,
+          so the random heat is the same on every synchronized controller.
+        - The strip is rendered in chunks and the effect yields whenever `self.budget` is spent,
+          so HTTP requests are served during long frames.
         - Any exceptions during execution are caught and printed.
         - The method prints a message when the effect is stopped.
         """
+        chunk = RenderBudget.CHUNK
         try:
             while not stop_event.is_set():
+                await self.clock.wait_frame(self.speed)
+                self.budget.start()
+
                 # Adds heat to a random position on the LED strip.
                 self.heat[random.randint(0, self.n - 1)] = int(255 * self.intensity)
 
-                for i in range(self.n - 1, 0, -1):
-                    decay = random.randint(0, self.cooling)
-                    wave = random.randint(-10, 10)
-                    self.heat[i] = max(0, min(255, int((self.heat[i] + self.heat[i - 1] + wave) * (1 - decay / 255.0))))
+                # The strip is processed in chunks, yielding when the render budget runs out.
+                for end in range(self.n - 1, 0, -chunk):
+                    for i in range(end, max(0, end - chunk), -1):
+                        decay = random.randint(0, self.cooling)
+                        wave = random.randint(-10, 10)
+                        self.heat[i] = max(0, min(255, int((self.heat[i] + self.heat[i - 1] + wave) * (1 - decay / 255.0))))
+                    await self.budget.check()
 
                 # Convert temperature values to colors from the palette.
-                for i in range(self.n):
-                    color_index = int(self.heat[i] / 255.0 * len(self.palette))
-                    color_index = max(0, min(len(self.palette) - 1, color_index))
-                    self.strip[i] = self.palette[color_index]
+                for start in range(0, self.n, chunk):
+                    for i in range(start, min(self.n, start + chunk)):
+                        color_index = int(self.heat[i] / 255.0 * len(self.palette))
+                        color_index = max(0, min(len(self.palette) - 1, color_index))
+                        self.strip[i] = self.palette[color_index]
+                    await self.budget.check()
 
                 await self.strip.write()
-                await asyncio.sleep(self.speed)
 
         except Exception as e:
             print(f"Error in Fire_v2: {e}")
@@ -1,5 +1,7 @@
 import uasyncio as asyncio
 
+from .clock import FrameClock
+
 
 class StrobeEffect:
     """
@@ -7,7 +9,7 @@ class StrobeEffect:
 
     """
 
-    def __init__(self, strip, params):
+    def __init__(self, strip, params, clock=None):
         """
         Initializes the StrobeEffect object.
 
@@ -20,8 +22,10 @@ class StrobeEffect:
                   'speed': The speed of the strobe effect (default is 0.1, range: 0.01 to 1.0).
                   'delay': The delay between strobe pulses (default is 0.2, range: 0.01 to 1.0).
                   'intensity': The intensity of the strobe pulses (default is 255, range: 0 to 255).
+        - clock: The FrameClock that paces the pulses (optional, a local clock is created if omitted).
         """
         self.strip = strip
+        self.clock = clock or FrameClock()
         self.r, self.g, self.b = self._parse_params(params)
         self.speed = params.get('speed', 0.1)
         self.delay = params.get('delay', 0.2)
@@ -57,20 +61,19 @@ class StrobeEffect:
         - Any exceptions that occur during the effect will be printed.
         """
         try:
-            n = len(self.strip)
+            color = (
+                int(self.r * self.intensity / 255),
+                int(self.g * self.intensity / 255),
+                int(self.b * self.intensity / 255),
+            )
             while not stop_event.is_set():
-                for i in range(n):
-                    self.strip[i] = (
-                        int(self.r * self.intensity / 255),
-                        int(self.g * self.intensity / 255),
-                        int(self.b * self.intensity / 255),
-                    )
+                # A pulse starts on every frame of length delay + speed
+                await self.clock.wait_frame(self.delay + self.speed)
+                self.strip.fill(color)  # fill() runs natively, no per-pixel loop blocking the event loop
                 await self.strip.write()
                 await asyncio.sleep(self.delay)
-                for i in range(n):
-                    self.strip[i] = (0, 0, 0)
+                self.strip.fill((0, 0, 0))
                 await self.strip.write()
-                await asyncio.sleep(self.speed)
         except Exception as e:
             print(f"Error in Strobe: {e}")
         finally:
@@ -1,11 +1,11 @@
 import random
 
-import uasyncio as asyncio
+from .clock import FrameClock
 
 
 class TwinkleEffect:
 
-    def __init__(self, strip, params):
+    def __init__(self, strip, params, clock=None):
         """
         Initialize a TwinkleEffect instance.
 
@@ -19,11 +19,13 @@ class TwinkleEffect:
                   - 'speed': Speed of the twinkling effect (default: 0.2, range: 0.01-1.0).
                   - 'num_leds': Number of LEDs to twinkle (default: 5, range: 1-60).
                   - 'intensity': Intensity of the twinkling effect (default: 255).
+        - clock: The FrameClock that paces the effect (optional, a local clock is created if omitted).
 
         Returns:
         - None
         """
         self.strip = strip
+        self.clock = clock or FrameClock()
         self.r, self.g, self.b = self._parse_params(params)
         self.speed = params.get('speed', 0.2)
         self.num_leds = params.get('num_leds', 5)  # number of flickering LEDs
@@ -61,6 +63,7 @@ class TwinkleEffect:
         try:
             n = len(self.strip)
             while not stop_event.is_set():
+                await self.clock.wait_frame(self.speed)
                 for i in range(self.num_leds):
                     led = random.randint(0, n - 1)
                     self.strip[led] = (
@@ -69,12 +72,11 @@ class TwinkleEffect:
                         int(self.b * self.intensity / 255),
                     )
                 await self.strip.write()
-                await asyncio.sleep(self.speed)
+                await self.clock.wait_frame(self.speed)
                 for i in range(self.num_leds):
                     led = random.randint(0, n - 1)
                     self.strip[led] = (0, 0, 0)
                 await self.strip.write()
-                await asyncio.sleep(self.speed)
 
         except Exception as e:
             print(f"Error in Twinkle: {e}")
@@ -1,70 +1,51 @@
-import network
 import uasyncio as asyncio
 
 import effects
+import sync
 import webserver
+import wifi
 import ws2812
 
-# Wi-Fi data for connect or create  Access Point
+# Wi-Fi network to connect to
 SSID = "WiFi_SSID"
 PASSWORD = "password"
+# Access Point created when the Wi-Fi network is not reachable
+AP_SSID = "ESP32_LED"
+AP_PASSWORD = "password"
 
 # LED strip setting
 LED_COUNT = 180
 PIN = 5
 STRIP = ws2812.WS2812(pin=PIN, pixel_count=LED_COUNT)
 
-
-async def connect_to_wifi():
-    """
-    This function is used to connect to a Wi-Fi network using the provided SSID and password.
-
-    Returns:
-    str: The IP address of the connected Wi-Fi network.
-    """
-    wlan = network.WLAN(network.STA_IF)
-    wlan.active(True)
-    wlan.connect(SSID, PASSWORD)
-
-    while not wlan.isconnected():
-        print("Connecting to WiFi...")
-        await asyncio.sleep(1)
-
-    print(f"Connected to WiFi: {SSID}")
-    print(f"IP address: {wlan.ifconfig()[0]}")
-    return wlan.ifconfig()[0]
-
-
-async def create_access_point():
-    """
-    This function is used to create a Wi-Fi access point using the provided SSID and password.
-
-    Parameters:
-    None. This function uses the global SSID and PASSWORD variables.
-
-    Returns:
-    str: The IP address of the created Wi-Fi access point.
-    """
-    ap = network.WLAN(network.AP_IF)
-    ap.active(True)
-    ap.config(essid=SSID, password=PASSWORD)
-    print(f"Access Point '{SSID}' started")
-    print(f"IP address: {ap.ifconfig()[0]}")
-    return ap.ifconfig()[0]
+# Frame synchronization between controllers: None, "leader" or "follower"
+SYNC_ROLE = None
+SYNC_SEED = 12345  # Effect seed broadcast by the leader
 
 
 async def main():
     """
     This is the main function that orchestrates the LED strip effects and web server.
 
-    The function creates an access point, starts the web server, and manages the LED strip effects.
+    The function connects to Wi-Fi (or creates an access point), starts the web server, and manages the LED strip effects.
     """
     stop_event = asyncio.Event()
-    effect_manager = effects.EffectManager(STRIP, stop_event)
-    ip_address = await create_access_point()
+    lag_monitor = effects.LoopLagMonitor()
+    clock = effects.FrameClock(seed=SYNC_SEED, lag_monitor=lag_monitor)
+    effect_manager = effects.EffectManager(STRIP, stop_event, clock)
+    wifi_manager = wifi.WiFiManager(SSID, PASSWORD, AP_SSID, AP_PASSWORD)
+    await wifi_manager.start()
+    asyncio.create_task(wifi_manager.run(asyncio.Event()))
+
+    asyncio.create_task(lag_monitor.run(asyncio.Event()))
+
+    if SYNC_ROLE:
+        sync_node = sync.SyncNode(clock, SYNC_ROLE)
+        asyncio.create_task(sync_node.run(asyncio.Event()))
 
     try:
-        web_server = webserver.WebServer(effect_manager, ip_address)
+        # Listen on all interfaces: the station may connect after the access point has started
+        web_server = webserver.WebServer(effect_manager, "0.0.0.0")
         await web_server.start()
     except KeyboardInterrupt:
         print("Stopping server...")
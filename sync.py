@@ -0,0 +1,150 @@
+import socket
+
+import uasyncio as asyncio
+import ujson
+import uselect
+
+SYNC_PORT = 4210
+
+
+class SyncNode:
+    """
+    Keeps the FrameClock of several controllers aligned over UDP.
+
+    The leader announces its clock time and effect seed to ``targets`` every ``interval`` seconds.
+    On each announcement a follower takes the seed and asks the leader for its time; the leader
+    answers at once and the follower sets its clock to the reply time plus half the round trip.
+    The remaining skew is bounded by half the round trip time (plus the ``POLL_MS`` receive latency),
+    the one-way delays are only assumed to be symmetric. Replies much slower than the best recent
+    round trip (e.g. held back by Wi-Fi power save) are ignored. On an idle LAN this gives a few ms,
+    on loopback about 1 ms; disable power save on the station (``pm=WLAN.PM_NONE``) for the best result.
+    """
+
+    POLL_MS = 2  # Period of the socket checks
+    MAX_RTT_MS = 200  # Round trips longer than this are never used
+
+    def __init__(self, clock, role, port=SYNC_PORT, targets=None, bind_ip="0.0.0.0", interval=1.0):
+        """
+        Initializes a new instance of the SyncNode class.
+
+        Parameters:
+            clock: The ``effects.clock.FrameClock`` instance shared with the EffectManager.
+            role (str): "leader" or "follower".
+            port (int, optional): The UDP port this node listens on. Defaults to 4210.
+            targets (list, optional): The (ip, port) addresses the leader announces to.
+                                      Defaults to the broadcast address on ``port``.
+                                      Several nodes on one host (loopback) need a port each.
+            bind_ip (str, optional): The address this node listens on. Defaults to "0.0.0.0".
+            interval (float, optional): The period between leader announcements in seconds. Defaults to 1.0.
+        """
+        if role not in ("leader", "follower"):
+            raise ValueError(f"Unknown sync role: {role}")
+        self.clock = clock
+        self.role = role
+        self.port = port
+        self.targets = targets or [("255.255.255.255", port)]
+        self.bind_ip = bind_ip
+        self.interval = interval
+        self.leader = None  # Address of the leader, learned from its announcements (followers only)
+        self.last_error = None  # Clock error in ms seen on the last reply (followers only)
+        self.last_rtt = None  # Round trip time in ms of the last reply (followers only)
+        self.best_rtt = self.MAX_RTT_MS
+        self.sock = None
+        self.poller = None
+        self.announce_task = None  # Leader only
+
+    async def run(self, stop_event):
+        """
+        Runs the sync loop until the stop event is set.
+
+        Parameters:
+            stop_event (asyncio.Event): An event object used to stop the loop.
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            if self.role == "leader" and hasattr(socket, "SO_BROADCAST"):  # Not exposed by every port
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            self.sock.bind((self.bind_ip, self.port))
+            self.sock.setblocking(False)
+            self.poller = uselect.poll()
+            self.poller.register(self.sock, uselect.POLLIN)
+            if self.role == "leader":
+                print(f"Sync leader started on {self.bind_ip}:{self.port}, seed {self.clock.seed}")
+                self.announce_task = asyncio.create_task(self._announce(stop_event))
+            else:
+                print(f"Sync follower listening on {self.bind_ip}:{self.port}")
+            await self._receive(stop_event)
+        except Exception as e:
+            print(f"Sync error: {e}")
+        finally:
+            if self.announce_task:  # Must not send on the closed socket
+                self.announce_task.cancel()
+                try:
+                    await self.announce_task
+                except asyncio.CancelledError:
+                    pass
+            self.sock.close()
+            print("Sync stopped")
+
+    def _send(self, packet, address):
+        try:
+            self.sock.sendto(ujson.dumps(packet).encode(), address)
+        except OSError as e:
+            print(f"Sync send error {address}: {e}")
+
+    async def _announce(self, stop_event):
+        """
+        Periodically sends the seed and clock time to all targets (leader only).
+        """
+        while not stop_event.is_set():
+            for target in self.targets:
+                self._send({"t": self.clock.now_ms(), "s": self.clock.seed}, target)
+            await asyncio.sleep(self.interval)
+
+    async def _receive(self, stop_event):
+        """
+        Waits for packets and handles them.
+
+        uasyncio has no datagram endpoints, so the socket is checked with a zero-timeout poll
+        every ``POLL_MS``, which bounds the receive latency.
+        """
+        while not stop_event.is_set():
+            if not self.poller.poll(0):
+                await asyncio.sleep(self.POLL_MS / 1000)
+                continue
+            try:
+                data, address = self.sock.recvfrom(128)
+            except OSError:
+                continue
+            try:
+                self._handle(ujson.loads(data), address)
+            except (ValueError, KeyError, TypeError) as e:
+                print(f"Invalid sync packet: {e}")
+
+    def _handle(self, packet, address):
+        """
+        Handles one packet.
+
+        Packets:
+            {"t", "s"}: leader announcement. A follower takes the seed and requests the time.
+            {"q"}: time request with the follower's local send time. The leader replies with "t" and "s" added.
+            {"q", "t", "s"}: time reply. The follower adjusts its clock by the round trip.
+        """
+        if self.role == "leader":
+            if "q" in packet and "t" not in packet:
+                self._send({"q": packet["q"], "t": self.clock.now_ms(), "s": self.clock.seed}, address)
+            return
+
+        if "q" not in packet:
+            self.leader = address
+            self.clock.seed = int(packet["s"])
+            self._send({"q": self.clock.local_ms()}, address)
+            return
+
+        rtt = self.clock.local_ms() - int(packet["q"])
+        self.best_rtt = min(self.best_rtt + 1, rtt)  # Ages so that a route change is picked up
+        if rtt < 0 or rtt > self.MAX_RTT_MS or rtt > 2 * self.best_rtt + self.POLL_MS:
+            return
+        self.last_rtt = rtt
+        self.clock.seed = int(packet["s"])
+        self.last_error = self.clock.adjust(int(packet["t"]) + rtt // 2)
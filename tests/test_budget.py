@@ -0,0 +1,102 @@
+import asyncio
+import random
+
+from effects.budget import LoopLagMonitor, RenderBudget
+from effects.firev2 import FireEffectV2
+
+
+def test_check_yields_once_the_budget_is_spent():
+    async def scenario(budget_ms):
+        ran = []
+
+        async def other():
+            ran.append(True)
+
+        budget = RenderBudget(budget_ms)
+        budget.start()
+        asyncio.create_task(other())
+        await budget.check()
+        return budget.yields, bool(ran)
+
+    assert asyncio.run(scenario(0)) == (1, True)
+    assert asyncio.run(scenario(10000)) == (0, False)
+
+
+def test_monitor_raises_divider_up_to_max_and_lowers_it_after_hold():
+    monitor = LoopLagMonitor(threshold_ms=20, max_divider=4, hold=3)
+    dividers = []
+    for _ in range(30):
+        monitor.add_sample(22)  # Steady lag just above the threshold
+        dividers.append(monitor.divider)
+    assert dividers[:2] == [1, 1]  # Nothing changes before hold samples
+    assert max(dividers) == 4 and dividers[-1] == 4
+    assert monitor.lag_ms > 20
+
+    for _ in range(30):
+        monitor.add_sample(0)
+    assert monitor.divider == 1
+    assert monitor.max_lag_ms == 22
+
+
+def test_monitor_keeps_divider_below_threshold():
+    monitor = LoopLagMonitor(threshold_ms=20, hold=1)
+    for _ in range(100):
+        monitor.add_sample(19)
+    assert monitor.divider == 1
+
+
+class OneFrameStrip:
+    """
+    Stops the effect after the first written frame.
+    """
+
+    def __init__(self, n, stop_event):
+        self.pixels = [(0, 0, 0)] * n
+        self.stop_event = stop_event
+
+    def __len__(self):
+        return len(self.pixels)
+
+    def __setitem__(self, key, value):
+        self.pixels[key] = value
+
+    async def write(self):
+        self.stop_event.set()
+
+
+class SeededClock:
+    async def wait_frame(self, period):
+        random.seed(123)
+        return 1
+
+
+def reference_fire_frame(effect, heat):
+    """
+    The unchunked fire frame from before the render budget was added.
+    """
+    random.seed(123)
+    n = len(heat)
+    heat[random.randint(0, n - 1)] = int(255 * effect.intensity)
+    for i in range(n - 1, 0, -1):
+        decay = random.randint(0, effect.cooling)
+        wave = random.randint(-10, 10)
+        heat[i] = max(0, min(255, int((heat[i] + heat[i - 1] + wave) * (1 - decay / 255.0))))
+    pixels = []
+    for i in range(n):
+        color_index = int(heat[i] / 255.0 * len(effect.palette))
+        color_index = max(0, min(len(effect.palette) - 1, color_index))
+        pixels.append(effect.palette[color_index])
+    return pixels
+
+
+def test_chunked_fire_frame_matches_unchunked_loop():
+    stop_event = asyncio.Event()
+    strip = OneFrameStrip(100, stop_event)  # Not a multiple of the chunk size
+    effect = FireEffectV2(strip, {"r": 255, "g": 80, "b": 10, "intensity": 200}, SeededClock())
+    effect.heat = [(i * 37) % 256 for i in range(100)]
+    effect.budget = RenderBudget(0)  # Yield after every chunk
+    expected = reference_fire_frame(effect, list(effect.heat))
+
+    asyncio.run(effect.run(stop_event))
+    assert strip.pixels == expected
+    assert effect.budget.yields >= 100 // RenderBudget.CHUNK
@@ -0,0 +1,25 @@
+import asyncio
+import random
+
+from effects.budget import LoopLagMonitor
+from effects.clock import FrameClock
+
+
+def expected_random(seed, frame):
+    random.seed((seed * 1000003 + frame) & 0x3FFFFFFF)
+    return random.random()
+
+
+def test_divider_keeps_frame_numbers_in_base_periods():
+    async def render(clock):
+        frame = await clock.wait_frame(0.01)
+        return frame, random.random()
+
+    monitor = LoopLagMonitor()
+    monitor.divider = 2
+    clock = FrameClock(seed=99, lag_monitor=monitor)
+    frames = [asyncio.run(render(clock)) for _ in range(3)]
+
+    assert all(frame % 2 == 0 for frame, _ in frames)
+    assert all(value == expected_random(99, frame) for frame, value in frames)
+
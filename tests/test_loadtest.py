@@ -0,0 +1,37 @@
+import asyncio
+
+from loadtest import frame_rate, parse_args, percentile, run
+
+
+def test_frame_rate_leaves_out_intervals_with_restarts():
+    frames = [0.0, 0.1, 0.2, 0.5, 0.6, 0.7]  # Restart at 0.25 delays the frame after 0.2
+
+    assert round(frame_rate(frames, 0.0, 1.0), 2) == 7.14
+    assert round(frame_rate(frames, 0.0, 1.0, restarts=[0.25]), 2) == 10.0
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([], 99) == 0.0
+
+
+def test_percentile_rounds_rank_up():
+    values = list(range(1, 151))  # round() would pick the 148th and 142nd values
+
+    assert percentile(values, 99) == 149
+    assert percentile(values, 95) == 143
+
+
+def test_run_smoke():
+    args = parse_args(["--duration", "1", "--warmup", "0.5", "--clients", "2", "--port", "18089",
+                       "--start-rate", "2"])
+    stats = asyncio.run(run(args))
+
+    assert stats["requests"] > 0
+    assert stats["error_rate"] == 0.0
+    assert stats["idle_fps"] > 0 and stats["load_fps"] > 0
+    assert stats["restarts"] >= 1
+    assert stats["max_divider"] >= 1
@@ -0,0 +1,76 @@
+import asyncio
+import random
+
+import sync
+from effects.clock import FrameClock
+
+LEADER_PORT = 47210
+
+
+async def run_nodes(followers, duration):
+    """
+    Runs a leader and the given number of followers on loopback and returns their clocks and nodes.
+    """
+    leader_clock = FrameClock(seed=4242)
+    leader_clock.offset = 100000  # Far from the followers, so the first correction is a jump
+    follower_clocks = [FrameClock() for _ in range(followers)]
+    ports = [LEADER_PORT + 1 + i for i in range(followers)]
+    stop_event = asyncio.Event()
+    leader = sync.SyncNode(leader_clock, "leader", port=LEADER_PORT, bind_ip="127.0.0.1",
+                           targets=[("127.0.0.1", port) for port in ports], interval=0.1)
+    nodes = [sync.SyncNode(clock, "follower", port=port, bind_ip="127.0.0.1")
+             for clock, port in zip(follower_clocks, ports)]
+    tasks = [asyncio.create_task(node.run(stop_event)) for node in [leader] + nodes]
+    await asyncio.sleep(duration)
+    skews = [clock.now_ms() - leader_clock.now_ms() for clock in follower_clocks]
+    stop_event.set()
+    await asyncio.gather(*tasks)
+    return leader_clock, follower_clocks, nodes, skews
+
+
+def test_followers_converge_on_loopback():
+    leader_clock, follower_clocks, nodes, skews = asyncio.run(run_nodes(3, 1.5))
+
+    assert all(abs(skew) <= 5 for skew in skews), skews
+    assert all(clock.seed == leader_clock.seed for clock in follower_clocks)
+    assert all(node.last_rtt is not None and node.last_rtt < 50 for node in nodes)
+
+
+def test_synchronized_frames_share_random_choices():
+    async def render(clock):
+        frame = await clock.wait_frame(0.05)
+        return frame, random.random()
+
+    async def scenario():
+        leader_clock, follower_clocks, _, _ = await run_nodes(2, 1.0)
+        # Start from the middle of a frame, so a skew of a few ms cannot pick another frame
+        await asyncio.sleep(((25 - leader_clock.now_ms()) % 50) / 1000)
+        return await asyncio.gather(*(render(clock) for clock in [leader_clock] + follower_clocks))
+
+    frames = asyncio.run(scenario())
+    assert len(set(frames)) == 1, frames
+
+
+def test_adjust_snaps_large_errors_and_slews_small_ones():
+    clock = FrameClock()
+    clock.adjust(clock.now_ms() + 10000)
+    assert abs(clock.now_ms() - clock.local_ms() - 10000) <= 1
+
+    offset = clock.offset
+    clock.adjust(clock.now_ms() + 100)
+    assert 45 <= clock.offset - offset <= 51
+
+
+def test_leader_stops_announcing_before_closing_socket():
+    async def scenario():
+        stop_event = asyncio.Event()
+        leader = sync.SyncNode(FrameClock(), "leader", port=LEADER_PORT, bind_ip="127.0.0.1",
+                               targets=[("127.0.0.1", LEADER_PORT + 1)], interval=0.05)
+        task = asyncio.create_task(leader.run(stop_event))
+        await asyncio.sleep(0.12)
+        stop_event.set()
+        await task
+        return leader
+
+    leader = asyncio.run(scenario())
+    assert leader.announce_task.done()
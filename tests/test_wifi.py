@@ -0,0 +1,213 @@
+import asyncio
+import json
+import time
+import types
+
+import pytest
+from micropython_shims import install_micropython_modules
+
+# Fake MicroPython network module, registered below before wifi is imported
+network = types.ModuleType("network")
+network.STA_IF, network.AP_IF = 0, 1
+network.STAT_CONNECTING, network.STAT_WRONG_PASSWORD, network.STAT_NO_AP_FOUND = 1001, 202, 201
+
+SCAN = [
+    (b"Home", b"\xaa\xaa\xaa\xaa\xaa\xaa", 11, -80, 3, False),
+    (b"Home", b"\x01\x02\x03\x04\x05\x06", 6, -40, 3, False),
+    (b"Other", b"\x0f\x0f\x0f\x0f\x0f\x0f", 1, -20, 3, False),
+]
+DHCP_CONFIG = ("192.168.1.50", "255.255.255.0", "192.168.1.1", "192.168.1.1")
+
+
+class FakeWLAN:
+    """
+    A station or access point interface. ``reachable`` decides whether connect() succeeds.
+    """
+
+    reachable = True
+    static_ip_works = True  # False: connects only with DHCP, e.g. after the router changed its subnet
+    fail_status = network.STAT_CONNECTING
+    stations = []
+
+    def __init__(self, interface):
+        self.interface = interface
+        self.calls = []
+        self.connect_times = []
+        self.connected = False
+        self.is_active = False
+        self.config_ip = ("0.0.0.0",) * 4
+
+    def active(self, value=None):
+        if value is None:
+            return self.is_active
+        self.is_active = value
+
+    def isconnected(self):
+        return self.connected
+
+    def status(self, param=None):
+        if param == "stations":
+            return FakeWLAN.stations
+        return FakeWLAN.fail_status
+
+    def scan(self):
+        self.calls.append(("scan",))
+        return SCAN
+
+    def connect(self, ssid, password, bssid=None):
+        self.calls.append(("connect", bssid))
+        self.connect_times.append(time.monotonic())
+        self.connected = FakeWLAN.reachable and (FakeWLAN.static_ip_works or self.config_ip[0] == "0.0.0.0")
+        if self.connected and self.config_ip[0] == "0.0.0.0":
+            self.config_ip = DHCP_CONFIG
+
+    def disconnect(self):
+        self.calls.append(("disconnect",))
+        self.connected = False
+
+    def ifconfig(self, config=None):
+        if config is None:
+            return ("192.168.4.1", "255.255.255.0", "192.168.4.1", "0.0.0.0") if self.interface else self.config_ip
+        self.calls.append(("ifconfig", config))
+        self.config_ip = ("0.0.0.0",) * 4 if config == "dhcp" else config
+
+    def config(self, **kwargs):
+        self.calls.append(("config", kwargs))
+
+
+network.WLAN = FakeWLAN
+install_micropython_modules(network_module=network)
+
+import wifi  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_network():
+    FakeWLAN.reachable = True
+    FakeWLAN.static_ip_works = True
+    FakeWLAN.fail_status = network.STAT_CONNECTING
+    FakeWLAN.stations = []
+
+
+def make_manager(tmp_path, **kwargs):
+    return wifi.WiFiManager("Home", "secret", "ESP32_LED", "appass", cache_file=str(tmp_path / "wifi.json"),
+                            fast_timeout=0.2, timeout=0.2, **kwargs)
+
+
+def test_first_connect_scans_and_caches_then_reuses_cache(tmp_path):
+    first = make_manager(tmp_path)
+    assert asyncio.run(first.start()) == DHCP_CONFIG[0]
+    assert first.sta.calls == [("ifconfig", "dhcp"), ("scan",), ("config", {"channel": 6}),
+                               ("connect", b"\x01\x02\x03\x04\x05\x06")]
+    with open(tmp_path / "wifi.json") as f:
+        assert json.load(f) == {"ssid": "Home", "bssid": "010203040506", "channel": 6, "ifconfig": list(DHCP_CONFIG)}
+
+    second = make_manager(tmp_path)
+    assert asyncio.run(second.start()) == DHCP_CONFIG[0]
+    assert second.sta.calls == [("ifconfig", DHCP_CONFIG), ("config", {"channel": 6}),
+                                ("connect", b"\x01\x02\x03\x04\x05\x06")]
+
+
+def test_cache_failure_falls_back_to_dhcp_then_access_point(tmp_path):
+    asyncio.run(make_manager(tmp_path).start())
+    FakeWLAN.reachable = False
+
+    manager = make_manager(tmp_path)
+    assert asyncio.run(manager.start()) == "192.168.4.1"
+    assert manager.sta.calls == [
+        ("ifconfig", DHCP_CONFIG), ("config", {"channel": 6}), ("connect", b"\x01\x02\x03\x04\x05\x06"),
+        ("disconnect",),
+        ("ifconfig", "dhcp"), ("scan",), ("config", {"channel": 6}), ("connect", b"\x01\x02\x03\x04\x05\x06"),
+        ("disconnect",),
+    ]
+    assert manager.ap.is_active
+    assert not (tmp_path / "wifi.json").exists()
+
+
+@pytest.mark.parametrize("status", [network.STAT_WRONG_PASSWORD, network.STAT_NO_AP_FOUND])
+def test_wait_connected_returns_early_on_failure_status(tmp_path, status):
+    FakeWLAN.fail_status = status
+    manager = make_manager(tmp_path)
+
+    start = time.monotonic()
+    assert not asyncio.run(manager._wait_connected(5.0))
+    assert time.monotonic() - start < 0.5
+
+
+def test_reconnect_dhcp_fallback_keeps_cached_bssid_and_channel(tmp_path):
+    asyncio.run(make_manager(tmp_path).start())
+    FakeWLAN.static_ip_works = False
+
+    manager = make_manager(tmp_path)
+    assert asyncio.run(manager.reconnect())
+    assert manager.sta.calls[-2:] == [("ifconfig", "dhcp"), ("connect", None)]
+    cache = manager.load_cache()
+    assert (cache["bssid"], cache["channel"]) == ("010203040506", 6)
+
+
+@pytest.mark.parametrize("content", [
+    '{"ssid": "Home", "bssid": "010203040506", "channel": 6}',
+    '{"ssid": "Home", "bssid": "zz", "channel": 6, "ifconfig": ["1.2.3.4", "255.0.0.0", "1.1.1.1", "8.8.8.8"]}',
+    '{"ssid": "Home", "bssid": null, "channel": "6", "ifconfig": ["1.2.3.4", "255.0.0.0", "1.1.1.1", "8.8.8.8"]}',
+    '{"ssid": "Home", "bssid": null, "channel": 6, "ifconfig": "1.2."}',
+    '{"ssid": "Home", "bssid"',
+    '["Home"]',
+])
+def test_malformed_cache_is_ignored(tmp_path, content):
+    (tmp_path / "wifi.json").write_text(content)
+    manager = make_manager(tmp_path)
+
+    assert manager.load_cache() is None
+    assert asyncio.run(manager.start()) == DHCP_CONFIG[0]
+    assert manager.load_cache()["bssid"] == "010203040506"
+
+
+def test_reconnect_without_cache_makes_one_dhcp_attempt(tmp_path):
+    FakeWLAN.reachable = False
+    manager = make_manager(tmp_path)
+
+    assert not asyncio.run(manager.reconnect())
+    assert manager.sta.calls == [("ifconfig", "dhcp"), ("connect", None)]
+
+
+async def run_for(manager, duration):
+    stop_event = asyncio.Event()
+    task = asyncio.create_task(manager.run(stop_event))
+    await asyncio.sleep(duration)
+    stop_event.set()
+    await task
+
+
+def test_run_retries_at_fixed_interval_without_disconnecting(tmp_path):
+    FakeWLAN.reachable = False
+    FakeWLAN.fail_status = network.STAT_NO_AP_FOUND  # Attempts fail at once
+    manager = make_manager(tmp_path, reconnect_interval=0.05)
+
+    asyncio.run(run_for(manager, 0.5))
+    gaps = [b - a for a, b in zip(manager.sta.connect_times, manager.sta.connect_times[1:])]
+    assert len(manager.sta.connect_times) >= 7
+    assert max(gaps) < 0.1  # No backoff while the access point is down
+    assert ("disconnect",) not in manager.sta.calls
+
+
+def test_run_backs_off_while_access_point_is_up(tmp_path):
+    FakeWLAN.reachable = False
+    FakeWLAN.fail_status = network.STAT_NO_AP_FOUND
+    manager = make_manager(tmp_path, reconnect_interval=0.05, max_reconnect_interval=0.2)
+    manager.start_ap()
+
+    asyncio.run(run_for(manager, 0.75))
+    gaps = [b - a for a, b in zip(manager.sta.connect_times, manager.sta.connect_times[1:])]
+    assert len(manager.sta.connect_times) <= 5  # 0.05, 0.1, 0.2, 0.2, ... instead of every 0.05
+    assert gaps[0] > 0.08 and max(gaps) < 0.3
+
+
+def test_run_skips_station_while_access_point_has_clients(tmp_path):
+
+    FakeWLAN.reachable = False
+    FakeWLAN.stations = [(b"\x10\x20\x30\x40\x50\x60",)]
+    manager = make_manager(tmp_path, reconnect_interval=0.01)
+    manager.start_ap()
+
+    asyncio.run(run_for(manager, 0.1))
+    assert manager.sta.calls == []
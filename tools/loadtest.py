@@ -0,0 +1,374 @@
+"""
+Load test for the WebServer while an effect is running.
+
+Runs on Linux with CPython: the MicroPython modules are mapped to their CPython counterparts
+and the NeoPixel driver is replaced by a simulated strip whose write() blocks for as long
+as the real one would. Several asyncio clients send a mix of requests to the server and
+the script reports throughput, latency percentiles, error rate and the effect frame rate.
+
+Every /start_effect restarts the effect, and the new one waits for the next frame boundary, so restarts
+are sent by one extra client at a fixed low rate (--start-rate) and the frame intervals that contain
+a restart are left out of the frame rate.
+
+The server and the effect run in a child process with the same wiring as main.py (LoopLagMonitor ->
+FrameClock -> EffectManager), so the clients do not share their event loop. They still share the CPU
+cores of the host: on a single-core machine the load generator still slows the server down.
+
+Usage (from the repository root):
+    python tools/loadtest.py --clients 8 --duration 10 --led-count 180
+    python tools/loadtest.py --max-p99 200 --max-error-rate 0.01 --max-fps-drop 0.3
+
+The script exits with status 1 if one of the --max-* limits is exceeded.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+
+from micropython_shims import install_micropython_modules
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Request profiles: ([(weight, method, path, body), ...], /start_effect requests per second)
+PROFILES = {
+    "mixed": ([
+        (2, "GET", "/", None),
+        (5, "GET", "/effects", None),
+    ], 1.0),
+    "read": ([
+        (1, "GET", "/", None),
+        (3, "GET", "/effects", None),
+    ], 0.0),
+    "control": ([
+        (1, "GET", "/effects", None),
+    ], 5.0),
+}
+
+
+class SimNeoPixel:
+    """
+    A stand-in for ``neopixel.NeoPixel`` that keeps the pixels in a list.
+
+    ``write()`` busy-waits for ``us_per_pixel`` per LED (WS2812 needs about 30 us per pixel)
+    and records the time of every frame.
+    """
+
+    us_per_pixel = 30
+
+    def __init__(self, pin, n):
+        self.pixels = [(0, 0, 0)] * n
+        self.frame_times = []
+
+    def write(self):
+        end = time.perf_counter() + len(self.pixels) * self.us_per_pixel / 1e6
+        while time.perf_counter() < end:
+            pass
+        self.frame_times.append(time.monotonic())
+
+    def fill(self, color):
+        self.pixels = [color] * len(self.pixels)
+
+    def __getitem__(self, key):
+        return self.pixels[key]
+
+    def __setitem__(self, key, value):
+        self.pixels[key] = value
+
+    def __len__(self):
+        return len(self.pixels)
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile (0-100) of the values using the nearest-rank method.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def frame_rate(frame_times, start, end, restarts=()):
+    """
+    Returns the number of frames per second written between start and end.
+
+    The rate is measured over the intervals between consecutive frames. Intervals that contain
+    an effect restart are left out, so only the effect of the load on rendering is measured.
+    """
+    frames = [t for t in frame_times if start <= t < end]
+    intervals = [(a, b) for a, b in zip(frames, frames[1:])
+                 if not any(a <= restart < b for restart in restarts)]
+    total = sum(b - a for a, b in intervals)
+    return len(intervals) / total if total > 0 else 0.0
+
+
+async def send_request(host, port, method, path, body, timeout):
+    """
+    Sends one HTTP request and reads the response until the server closes the connection.
+
+    Returns:
+        int: The HTTP status code of the response.
+    """
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    try:
+        payload = json.dumps(body) if body is not None else ""
+        request = f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(payload)}\r\n\r\n{payload}"
+        writer.write(request.encode())
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        return int(response.split(b" ", 2)[1])
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def client(host, port, profile, deadline, timeout, results):
+    """
+    Sends requests picked from the profile until the deadline and appends (path, latency_ms, ok) to results.
+    """
+    weights = [entry[0] for entry in profile]
+    while time.monotonic() < deadline:
+        _, method, path, body = random.choices(profile, weights)[0]
+        start = time.monotonic()
+        try:
+            status = await send_request(host, port, method, path, body, timeout)
+            ok = 200 <= status < 300
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            ok = False
+        results.append((path, (time.monotonic() - start) * 1000, ok))
+
+
+async def sample_divider(lag_monitor, dividers, stop_event):
+    """
+    Records the frame divider of the lag monitor until the stop event is set.
+    """
+    while not stop_event.is_set():
+        dividers.append(lag_monitor.divider)
+        await asyncio.sleep(0.05)
+
+
+async def controller(host, port, body, rate, deadline, timeout, results, restarts):
+    """
+    Sends /start_effect at a fixed rate until the deadline and records the restart times.
+    """
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        restarts.append(start)
+        try:
+            status = await send_request(host, port, "POST", "/start_effect", body, timeout)
+            ok = 200 <= status < 300
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            ok = False
+        results.append(("/start_effect", (time.monotonic() - start) * 1000, ok))
+        await asyncio.sleep(max(0.0, start + 1 / rate - time.monotonic()))
+
+
+async def serve(args):
+    """
+    Runs the server and the effect with the main.py wiring (server process).
+
+    Prints READY once the server listens, then follows the commands read from stdin: LOAD marks
+    the start of the load phase, STOP (or the end of stdin) stops everything. Finally the frame
+    times and the lag monitor figures are printed as a STATS line.
+    """
+    import effects
+    import webserver
+    import ws2812
+
+    # Same wiring as main.py
+    strip = ws2812.WS2812(pin=5, pixel_count=args.led_count)
+    lag_monitor = effects.LoopLagMonitor()
+    clock = effects.FrameClock(lag_monitor=lag_monitor)
+    effect_manager = effects.EffectManager(strip, asyncio.Event(), clock)
+    monitor_stop = asyncio.Event()
+    tasks = [asyncio.create_task(lag_monitor.run(monitor_stop))]
+    server = webserver.WebServer(effect_manager, args.host, args.port)
+    server_task = asyncio.create_task(server.start())
+    while server.server is None and not server_task.done():
+        await asyncio.sleep(0.01)
+    await effect_manager.handle_effect(args.effect, {"speed": args.speed})
+    print("READY", flush=True)
+
+    loop = asyncio.get_running_loop()
+    dividers = []
+    while True:
+        command = (await loop.run_in_executor(None, sys.stdin.readline)).strip()
+        if command == "LOAD":
+            lag_monitor.max_lag_ms = 0  # Only the lag under load is reported
+            tasks.append(asyncio.create_task(sample_divider(lag_monitor, dividers, monitor_stop)))
+        elif command in ("STOP", ""):
+            break
+
+    monitor_stop.set()
+    await asyncio.gather(*tasks)
+    await effect_manager.stop_all()
+    await server.stop()
+    await server_task
+    print("STATS " + json.dumps({
+        "frame_times": strip.np.frame_times,
+        "max_lag_ms": lag_monitor.max_lag_ms,
+        "max_divider": max(dividers, default=lag_monitor.divider),
+    }), flush=True)
+
+
+async def run(args):
+    """
+    Starts the server process, measures the idle frame rate, then runs the clients.
+
+    The server and the effect run in a separate process, so the CPU time and scheduling of the clients
+    do not show up in the latency, loop lag or frame rate. Frame times are compared across the processes,
+    which works because ``time.monotonic()`` is system-wide on Linux.
+
+    Returns:
+        dict: The measured statistics.
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.abspath(__file__), "--serve", "--host", args.host, "--port", str(args.port),
+        "--led-count", str(args.led_count), "--effect", args.effect, "--speed", str(args.speed),
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, limit=2 ** 24,
+    )
+    ready = asyncio.Event()
+    server_stats = {}
+
+    async def read_output():
+        # Keeps draining the server output, the effects print on every restart
+        async for line in process.stdout:
+            line = line.decode().strip()
+            if line == "READY":
+                ready.set()
+            elif line.startswith("STATS "):
+                server_stats.update(json.loads(line[len("STATS "):]))
+
+    reader_task = asyncio.create_task(read_output())
+    try:
+        await asyncio.wait_for(ready.wait(), 10)
+        idle_start = time.monotonic()
+        await asyncio.sleep(args.warmup)
+        idle_end = time.monotonic()
+        process.stdin.write(b"LOAD\n")
+        await process.stdin.drain()
+
+        requests, start_rate = PROFILES[args.profile]
+        if args.start_rate is not None:
+            start_rate = args.start_rate
+        results = []
+        restarts = []
+        deadline = time.monotonic() + args.duration
+        clients = [client(args.host, args.port, requests, deadline, args.timeout, results)
+                   for _ in range(args.clients)]
+        if start_rate > 0:
+            body = {"effect": args.effect, "speed": args.speed}
+            clients.append(controller(args.host, args.port, body, start_rate, deadline, args.timeout, results, restarts))
+        await asyncio.gather(*clients)
+        load_end = time.monotonic()
+
+        process.stdin.write(b"STOP\n")
+        await process.stdin.drain()
+        await reader_task
+    finally:
+        if process.returncode is None and not server_stats:
+            process.kill()
+        await process.wait()
+
+    frame_times = server_stats["frame_times"]
+    idle_fps = frame_rate(frame_times, idle_start, idle_end)
+    load_fps = frame_rate(frame_times, idle_end, load_end, restarts)
+    latencies = [latency for _, latency, _ in results]
+    errors = sum(1 for _, _, ok in results if not ok)
+    routes = {}
+    for path, latency, _ in results:
+        routes.setdefault(path, []).append(latency)
+    return {
+        "requests": len(results),
+        "throughput": len(results) / (load_end - idle_end),
+        "error_rate": errors / len(results) if results else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "routes": {path: (len(values), percentile(values, 50), percentile(values, 99))
+                   for path, values in routes.items()},
+        "idle_fps": idle_fps,
+        "load_fps": load_fps,
+        "fps_drop": 1 - load_fps / idle_fps if idle_fps else 0.0,
+        "restarts": len(restarts),
+        "max_lag_ms": server_stats["max_lag_ms"],
+        "max_divider": server_stats["max_divider"],
+    }
+
+
+def report(stats):
+    """
+    Prints the statistics in a readable form.
+    """
+    print("-" * 20)
+    print(f"Requests: {stats['requests']} ({stats['throughput']:.1f} req/s)")
+    print(f"Error rate: {stats['error_rate']:.1%}")
+    print(f"Latency p50/p95/p99: {stats['p50']:.1f} / {stats['p95']:.1f} / {stats['p99']:.1f} ms")
+    for path, (count, p50, p99) in sorted(stats["routes"].items()):
+        print(f"  {path:<14} {count:>6} requests, p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+    print(f"Effect frame rate: {stats['idle_fps']:.1f} fps idle, {stats['load_fps']:.1f} fps under load "
+          f"({stats['fps_drop']:.1%} drop, {stats['restarts']} restarts excluded)")
+    print(f"Event loop lag under load: max {stats['max_lag_ms']} ms, frame divider up to x{stats['max_divider']}")
+    print("-" * 20)
+
+
+def check_limits(stats, args):
+    """
+    Compares the statistics with the --max-* limits.
+
+    Returns:
+        list: A message for every exceeded limit.
+    """
+    failures = []
+    if args.max_p99 is not None and stats["p99"] > args.max_p99:
+        failures.append(f"p99 latency {stats['p99']:.1f} ms > {args.max_p99} ms")
+    if args.max_error_rate is not None and stats["error_rate"] > args.max_error_rate:
+        failures.append(f"error rate {stats['error_rate']:.1%} > {args.max_error_rate:.1%}")
+    if args.max_fps_drop is not None and stats["fps_drop"] > args.max_fps_drop:
+        failures.append(f"frame rate drop {stats['fps_drop']:.1%} > {args.max_fps_drop:.1%}")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the LED strip web server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=8, help="Number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="Load phase length in seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Idle phase length used for the reference frame rate")
+    parser.add_argument("--timeout", type=float, default=5.0, help="Per-request timeout in seconds")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--led-count", type=int, default=180)
+    parser.add_argument("--effect", default="fire_v2")
+    parser.add_argument("--speed", type=float, default=0.05, help="Effect frame period in seconds")
+    parser.add_argument("--start-rate", type=float, help="/start_effect requests per second (overrides the profile)")
+    parser.add_argument("--max-p99", type=float, help="Fail if p99 latency exceeds this many ms")
+    parser.add_argument("--max-error-rate", type=float, help="Fail if the error rate exceeds this fraction")
+    parser.add_argument("--max-fps-drop", type=float, help="Fail if the frame rate drops by more than this fraction")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)  # Server process started by run()
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.serve:
+        os.chdir(ROOT)  # The server opens templates/ relative to the working directory
+        sys.path.insert(0, ROOT)
+        install_micropython_modules(neopixel_class=SimNeoPixel)
+        asyncio.run(serve(args))
+        return 0
+    stats = asyncio.run(run(args))
+    report(stats)
+    failures = check_limits(stats, args)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+CPython replacements for the MicroPython modules used by the firmware.
+
+Lets the firmware modules (effects, sync, webserver, wifi) run on Linux, e.g. in tools/loadtest.py
+and in tests/. Hardware modules without a CPython counterpart (network, neopixel) are only
+registered when a replacement is passed in.
+"""
+import asyncio
+import binascii
+import json
+import os
+import select
+import sys
+import time
+import types
+
+
+def ticks_diff(a, b):
+    diff = (a - b) & 0x3FFFFFFF
+    return diff - 0x40000000 if diff >= 0x20000000 else diff
+
+
+def install_micropython_modules(neopixel_class=None, network_module=None):
+    """
+    Registers CPython replacements for the MicroPython modules in ``sys.modules``.
+
+    Parameters:
+        neopixel_class: The class used as ``neopixel.NeoPixel`` (optional).
+        network_module: The module used as ``network`` (optional).
+    """
+    utime = types.ModuleType("utime")
+    utime.ticks_ms = lambda: int(time.monotonic() * 1000) & 0x3FFFFFFF
+    utime.ticks_diff = ticks_diff
+    utime.ticks_add = lambda a, b: (a + b) & 0x3FFFFFFF
+    utime.sleep_ms = lambda ms: time.sleep(ms / 1000)
+
+    machine = types.ModuleType("machine")
+    machine.Pin = lambda pin: pin
+
+    sys.modules.update({
+        "uasyncio": asyncio,
+        "ubinascii": binascii,
+        "ujson": json,
+        "uos": os,
+        "uselect": select,
+        "utime": utime,
+        "machine": machine,
+    })
+    if neopixel_class is not None:
+        neopixel = types.ModuleType("neopixel")
+        neopixel.NeoPixel = neopixel_class
+        sys.modules["neopixel"] = neopixel
+    if network_module is not None:
+        sys.modules["network"] = network_module
@@ -0,0 +1,269 @@
+import network
+import uasyncio as asyncio
+import ubinascii
+import ujson
+import uos
+import utime
+
+CACHE_FILE = "wifi.json"
+
+
+class WiFiManager:
+    def __init__(self, ssid, password, ap_ssid, ap_password, cache_file=CACHE_FILE,
+                 fast_timeout=2.0, timeout=8.0, reconnect_interval=5.0, max_reconnect_interval=300.0):
+        """
+        Initializes a new instance of the WiFiManager class.
+
+        The manager connects to a Wi-Fi network as a station and falls back to an access point.
+        The BSSID, channel and IP configuration of the last successful connection are cached on flash,
+        so the next connection skips the scan and DHCP and takes about a second.
+
+        Parameters:
+            ssid (str): The SSID of the Wi-Fi network to connect to.
+            password (str): The password of the Wi-Fi network.
+            ap_ssid (str): The SSID of the fallback access point.
+            ap_password (str): The password of the fallback access point.
+            cache_file (str, optional): The file with the cached connection parameters. Defaults to "wifi.json".
+            fast_timeout (float, optional): Connection deadline with cached parameters, in seconds. Defaults to 2.0.
+            timeout (float, optional): Connection deadline without cached parameters, in seconds. Defaults to 8.0.
+            reconnect_interval (float, optional): Period of the background connection check, in seconds.
+                                                  Defaults to 5.0.
+            max_reconnect_interval (float, optional): Longest wait between failed reconnects while
+                                                      the access point is up, in seconds. Defaults to 300.0.
+        """
+        self.ssid = ssid
+        self.password = password
+        self.ap_ssid = ap_ssid
+        self.ap_password = ap_password
+        self.cache_file = cache_file
+        self.fast_timeout = fast_timeout
+        self.timeout = timeout
+        self.reconnect_interval = reconnect_interval
+        self.max_reconnect_interval = max_reconnect_interval
+        self.sta = network.WLAN(network.STA_IF)
+        self.ap = network.WLAN(network.AP_IF)
+        # Statuses after which waiting for the deadline is pointless
+        self._failures = [getattr(network, name) for name in ("STAT_WRONG_PASSWORD", "STAT_NO_AP_FOUND")
+                          if hasattr(network, name)]
+
+    def load_cache(self):
+        """
+        Reads the cached connection parameters.
+
+        Returns:
+            dict: The cached parameters, or None if there is no valid cache for the configured SSID.
+        """
+        try:
+            with open(self.cache_file, "r") as f:
+                cache = ujson.load(f)
+            if cache.get("ssid") != self.ssid:
+                return None
+            if cache.get("bssid") is not None and len(ubinascii.unhexlify(cache["bssid"])) != 6:
+                return None
+            if cache.get("channel") is not None and not isinstance(cache["channel"], int):
+                return None
+            ifconfig = cache["ifconfig"]
+            if not isinstance(ifconfig, list) or len(ifconfig) != 4 or not all(isinstance(value, str) for value in ifconfig):
+                return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None  # Missing, partial or hand-edited file
+        return cache
+
+    def save_cache(self, cache):
+        """
+        Writes the connection parameters to flash if they have changed.
+
+        Parameters:
+            cache (dict): The parameters with the keys ssid, bssid, channel and ifconfig.
+        """
+        if cache == self.load_cache():
+            return  # Spare the flash
+        try:
+            with open(self.cache_file, "w") as f:
+                ujson.dump(cache, f)
+        except OSError as e:
+            print(f"Failed to save Wi-Fi cache: {e}")
+
+    def clear_cache(self):
+        """
+        Removes the cached connection parameters.
+        """
+        try:
+            uos.remove(self.cache_file)
+        except OSError:
+            pass
+
+    def _scan(self):
+        """
+        Scans for the configured SSID. This call blocks for about two seconds.
+
+        Returns:
+            tuple: The (bssid, channel) of the strongest access point, or None if it was not found.
+        """
+        best = None
+        for ssid, bssid, channel, rssi, *_ in self.sta.scan():
+            if ssid.decode() == self.ssid and (best is None or rssi > best[2]):
+                best = (bssid, channel, rssi)
+        return best[:2] if best else None
+
+    async def _wait_connected(self, timeout):
+        """
+        Waits until the station is connected, the connection fails or the deadline passes.
+
+        Returns:
+            bool: True if the station is connected.
+        """
+        deadline = utime.ticks_add(utime.ticks_ms(), int(timeout * 1000))
+        while utime.ticks_diff(deadline, utime.ticks_ms()) > 0:
+            if self.sta.isconnected():
+                return True
+            if self.sta.status() in self._failures:
+                return False
+            await asyncio.sleep(0.05)
+        return self.sta.isconnected()
+
+    async def connect_sta(self, cache=None, scan=True):
+        """
+        Connects to the Wi-Fi network as a station.
+
+        With cached parameters the static IP configuration is applied, the known access point and channel
+        are used and the short deadline applies. Without them the network is scanned (if scan is True)
+        for the strongest access point and DHCP is used. The parameters of a successful connection are cached.
+        A failed attempt is not disconnected, so the driver keeps retrying on its own.
+
+        Parameters:
+            cache (dict, optional): The cached connection parameters.
+            scan (bool, optional): Whether a blocking scan may be done when there is no cache. Defaults to True.
+
+        Returns:
+            bool: True if the station is connected.
+        """
+        self.sta.active(True)
+        if self.sta.isconnected():
+            return True
+        bssid = channel = None
+        if cache:
+            bssid = ubinascii.unhexlify(cache["bssid"]) if cache.get("bssid") else None
+            channel = cache.get("channel")
+            self.sta.ifconfig(tuple(cache["ifconfig"]))  # Static IP: no DHCP round trip
+            timeout = self.fast_timeout
+        else:
+            self.sta.ifconfig("dhcp")
+            found = self._scan() if scan else None
+            if found:
+                bssid, channel = found
+            timeout = self.timeout
+        if channel:
+            try:
+                self.sta.config(channel=channel)
+            except (OSError, ValueError):
+                pass  # Not every port lets the station channel be set
+        print(f"Connecting to WiFi {self.ssid}{' (cached)' if cache else ''}...")
+        if bssid:
+            self.sta.connect(self.ssid, self.password, bssid=bssid)
+        else:
+            self.sta.connect(self.ssid, self.password)
+
+        if not await self._wait_connected(timeout):
+            return False
+        previous = self.load_cache()
+        if bssid is None and previous:
+            # A DHCP connection to the same network keeps the known access point and channel
+            bssid = ubinascii.unhexlify(previous["bssid"]) if previous.get("bssid") else None
+            channel = previous.get("channel")
+        self.save_cache({
+            "ssid": self.ssid,
+            "bssid": ubinascii.hexlify(bssid).decode() if bssid else None,
+            "channel": channel,
+            "ifconfig": list(self.sta.ifconfig()),
+        })
+        print(f"Connected to WiFi: {self.ssid}")
+        print(f"IP address: {self.sta.ifconfig()[0]}")
+        return True
+
+    def start_ap(self):
+        """
+        Creates the fallback access point.
+
+        Returns:
+            str: The IP address of the access point.
+        """
+        self.ap.active(True)
+        self.ap.config(essid=self.ap_ssid, password=self.ap_password)
+        print(f"Access Point '{self.ap_ssid}' started")
+        print(f"IP address: {self.ap.ifconfig()[0]}")
+        return self.ap.ifconfig()[0]
+
+    async def start(self):
+        """
+        Brings the network up: cached station connection, then a fresh one, then the access point.
+
+        Failed attempts are disconnected here, so the driver does not keep retrying with stale
+        parameters or scan channels while the access point is up.
+
+        Returns:
+            str: The IP address the controller is reachable at.
+        """
+        cache = self.load_cache()
+        if cache:
+            if await self.connect_sta(cache):
+                return self.sta.ifconfig()[0]
+            print("Cached WiFi parameters failed")
+            self.sta.disconnect()
+            self.clear_cache()
+        if await self.connect_sta():
+            return self.sta.ifconfig()[0]
+        print(f"Could not connect to WiFi: {self.ssid}")
+        self.sta.disconnect()
+        return self.start_ap()
+
+    def ap_has_clients(self):
+        """
+        Returns True if the access point is up and has connected stations.
+        """
+        try:
+            return bool(self.ap.active() and self.ap.status("stations"))
+        except (OSError, ValueError):
+            return False
+
+    async def reconnect(self):
+        """
+        Tries to connect the station without scanning: first with the cached parameters if there are any,
+        then with DHCP. The DHCP attempt keeps the cached BSSID and channel.
+
+        Returns:
+            bool: True if the station is connected.
+        """
+        cache = self.load_cache()
+        if cache and await self.connect_sta(cache, scan=False):
+            return True
+        return await self.connect_sta(scan=False)
+
+    async def run(self, stop_event):
+        """
+        Checks the station connection in the background and reconnects when it is lost.
+
+        Scans are skipped here because they block the event loop, and failed attempts are not
+        disconnected, so the driver's own reconnect keeps running between them. Attempts are made every
+        ``reconnect_interval``; only while the access point is up the wait is doubled after every failure,
+        up to ``max_reconnect_interval``, because each station connect scans channels and disturbs it.
+        While clients are connected to the access point no attempt is made at all.
+
+        Parameters:
+            stop_event (asyncio.Event): An event object used to stop the loop.
+        """
+        interval = self.reconnect_interval
+        while not stop_event.is_set():
+            await asyncio.sleep(interval)
+            if self.sta.isconnected() or self.ap_has_clients():
+                interval = self.reconnect_interval
+                continue
+            try:
+                connected = await self.reconnect()
+            except OSError as e:
+                print(f"WiFi reconnect error: {e}")
+                connected = False
+            if connected or not self.ap.active():
+                interval = self.reconnect_interval
+            else:
+                interval = min(interval * 2, self.max_reconnect_interval)